@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, MutableSequence, Sequence
+from dataclasses import dataclass, field
+from itertools import chain, compress
+from typing import Any
+
+from src.primitive_db.constants import ID_COLUMN
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+# Turns a bool bytearray into its negation, so "== False" is a truthy scan.
+_NEGATE_BOOL = bytes([1, 0]) + bytes(254)
+
+
+def _pack(values: list[Any]) -> tuple[MutableSequence[Any], bool]:
+    """Pick the most compact storage for values; return (storage, is_bool)."""
+    if values and all(type(v) is bool for v in values):
+        return bytearray(values), True
+    if values and all(type(v) is int for v in values):
+        try:
+            return array("q", values), False
+        except OverflowError:
+            pass
+    return list(values), False
+
+
+@dataclass
+class Columns:
+    """Table rows stored column-wise (struct of arrays).
+
+    int columns live in array('q'), bool columns in bytearray (decoded back
+    to bool on read), everything else in plain lists. A column falls back to
+    a list as soon as a value does not fit its compact storage.
+    """
+
+    names: list[str] = field(default_factory=list)
+    data: dict[str, MutableSequence[Any]] = field(default_factory=dict)
+    bool_columns: set[str] = field(default_factory=set)
+    _id_index: dict[Any, int] | None = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_rows(cls, rows: list[dict[str, Any]]) -> Columns:
+        names = list(dict.fromkeys(chain.from_iterable(rows)))
+        table = cls(names=names)
+        for name in names:
+            storage, is_bool = _pack([row.get(name) for row in rows])
+            table.data[name] = storage
+            if is_bool:
+                table.bool_columns.add(name)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.data[self.names[0]]) if self.names else 0
+
+    def column(self, name: str) -> MutableSequence[Any]:
+        """Return raw column storage (bool columns hold 0/1)."""
+        return self.data.get(name, [])
+
+    def value(self, name: str, i: int) -> Any:
+        v = self.data[name][i]
+        return bool(v) if name in self.bool_columns else v
+
+    def row(self, i: int) -> dict[str, Any]:
+        return {name: self.value(name, i) for name in self.names}
+
+    def rows(self, positions: Iterable[int]) -> list[dict[str, Any]]:
+        return [self.row(i) for i in positions]
+
+    def take(self, name: str, positions: Sequence[int]) -> list[Any]:
+        """Return decoded values of column name at positions.
+
+        A contiguous range is taken as a single slice of the storage.
+        """
+        col = self.data.get(name)
+        if col is None:
+            return [None] * len(positions)
+        if isinstance(positions, range) and positions.step == 1:
+            values = col[positions.start : positions.stop]
+        else:
+            values = [col[i] for i in positions]
+        if name in self.bool_columns:
+            return [bool(v) for v in values]
+        return list(values)
+
+    def to_rows(self) -> list[dict[str, Any]]:
+        return self.rows(range(len(self)))
+
+    def id_index(self) -> dict[Any, int]:
+        """Return ID -> position map, built on first use.
+
+        Mutations drop the map instead of editing it, so copies may share it.
+        """
+        if self._id_index is None:
+            self._id_index = {v: i for i, v in enumerate(self.column(ID_COLUMN))}
+        return self._id_index
+
+    def find(self, name: str, value: Any) -> list[int]:
+        """Return positions where column name == value.
+
+        The scan runs in C: bool columns are filtered with itertools.compress
+        over the bytearray, other columns jump between matches with seq.index.
+        """
+        col = self.column(name)
+        if name in self.bool_columns and type(value) is bool:
+            mask = col if value else col.translate(_NEGATE_BOOL)
+            return list(compress(range(len(col)), mask))
+
+        positions: list[int] = []
+        i = -1
+        try:
+            while True:
+                i = col.index(value, i + 1)
+                positions.append(i)
+        except ValueError:
+            return positions
+        except TypeError:
+            return [i for i, v in enumerate(col) if v == value]
+
+    def copy(self) -> Columns:
+        return Columns(
+            names=list(self.names),
+            data={name: col[:] for name, col in self.data.items()},
+            bool_columns=set(self.bool_columns),
+            _id_index=self._id_index,
+        )
+
+    def append(self, record: dict[str, Any]) -> None:
+        self._id_index = None
+        if not self.names:
+            new = Columns.from_rows([record])
+            self.names, self.data, self.bool_columns = (
+                new.names,
+                new.data,
+                new.bool_columns,
+            )
+            return
+
+        for name in record:
+            if name not in self.data:
+                self._add_column(name)
+
+        for name in self.names:
+            value = record.get(name)
+            if not self._fits(name, value):
+                self._demote(name)
+            self.data[name].append(value)
+
+    def set(self, i: int, name: str, value: Any) -> None:
+        if name == ID_COLUMN:
+            self._id_index = None
+        if name not in self.data:
+            self._add_column(name)
+        if not self._fits(name, value):
+            self._demote(name)
+        self.data[name][i] = value
+
+    def delete(self, positions: list[int]) -> None:
+        if not positions:
+            return
+        self._id_index = None
+        if len(positions) == 1:
+            for col in self.data.values():
+                del col[positions[0]]
+            return
+
+        drop = set(positions)
+        keep = [i not in drop for i in range(len(self))]
+        for name, col in self.data.items():
+            kept = col[:0]
+            kept.extend(compress(col, keep))
+            self.data[name] = kept
+
+    def _add_column(self, name: str) -> None:
+        self.data[name] = [None] * len(self)
+        self.names.append(name)
+
+    def _fits(self, name: str, value: Any) -> bool:
+        col = self.data[name]
+        if isinstance(col, bytearray):
+            return type(value) is bool
+        if isinstance(col, array):
+            return type(value) is int and _INT64_MIN <= value <= _INT64_MAX
+        return True
+
+    def _demote(self, name: str) -> None:
+        col = self.data[name]
+        self.data[name] = [self.value(name, i) for i in range(len(col))]
+        self.bool_columns.discard(name)
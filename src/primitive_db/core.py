@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from typing import Any
 
+from src.primitive_db.columns import Columns
 from src.primitive_db.constants import ID_COLUMN, SUPPORTED_TYPES
 from src.primitive_db.decorators import DBError, InvalidValue, confirm_action
 
@@ -31,47 +33,142 @@ def _parse_column_spec(spec: str) -> Column:
     return Column(name=name, type_name=type_name)
 
 
-def _schema_columns(meta: dict[str, Any], table_name: str) -> list[Column]:
+def _coerce_str(raw: Any) -> str:
+    if not isinstance(raw, str):
+        raw = str(raw)
+    return raw
+
+
+def _coerce_int(raw: Any) -> int:
+    if isinstance(raw, bool):
+        raise InvalidValue(raw, "Ожидалось int")
+    try:
+        return int(raw)
+    except Exception as exc:
+        raise InvalidValue(raw, "Ожидалось int") from exc
+
+
+def _coerce_bool(raw: Any) -> bool:
+    if isinstance(raw, bool):
+        return raw
+    if isinstance(raw, str):
+        v = raw.strip().lower()
+        if v in {"true", "1", "yes", "y", "да", "д"}:
+            return True
+        if v in {"false", "0", "no", "n", "нет", "н"}:
+            return False
+    raise InvalidValue(raw, "Ожидалось bool")
+
+
+_COERCERS: dict[str, Callable[[Any], Any]] = {
+    "str": _coerce_str,
+    "int": _coerce_int,
+    "bool": _coerce_bool,
+}
+
+
+def _make_coercer(type_name: str) -> Callable[[Any], Any]:
+    """Return the coercion function for one column type.
+
+    Resolve it once per column and reuse it for every row, instead of
+    dispatching on type_name for each value.
+    """
+    coerce = _COERCERS.get(type_name)
+    if coerce is None:
+        raise InvalidValue(type_name, "Неподдерживаемый тип")
+    return coerce
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    columns: list[Column]
+    coercers: dict[str, Callable[[Any], Any]]
+    user_coercers: list[tuple[str, Callable[[Any], Any]]]
+
+
+# table name -> (metadata "columns" list the schema was built from, schema)
+_SCHEMA_CACHE: dict[str, tuple[list[dict[str, Any]], TableSchema]] = {}
+
+
+def _table_schema(meta: dict[str, Any], table_name: str) -> TableSchema:
+    """Return the parsed schema of table_name, reusing it while unchanged.
+
+    The cache entry is valid while metadata holds the same columns list
+    (or an equal one, e.g. a for_write copy), so saving a changed schema
+    invalidates it without any explicit hook.
+    """
     meta = _normalize_meta(meta)
     if table_name not in meta["tables"]:
         raise KeyError(table_name)
-    cols = meta["tables"][table_name]["columns"]
-    return [Column(**c) for c in cols]
+    raw_cols = meta["tables"][table_name]["columns"]
+
+    cached = _SCHEMA_CACHE.get(table_name)
+    if cached is not None:
+        if cached[0] is raw_cols:
+            return cached[1]
+        if cached[0] == raw_cols:
+            _SCHEMA_CACHE[table_name] = (raw_cols, cached[1])
+            return cached[1]
+
+    cols = [Column(**c) for c in raw_cols]
+    coercers = {c.name: _make_coercer(c.type_name) for c in cols}
+    schema = TableSchema(
+        columns=cols,
+        coercers=coercers,
+        user_coercers=[(n, f) for n, f in coercers.items() if n != ID_COLUMN],
+    )
+    _SCHEMA_CACHE[table_name] = (raw_cols, schema)
+    return schema
 
 
-def _schema_map(cols: list[Column]) -> dict[str, str]:
-    return {c.name: c.type_name for c in cols}
+def _schema_columns(meta: dict[str, Any], table_name: str) -> list[Column]:
+    return _table_schema(meta, table_name).columns
 
 
-def _coerce_value(type_name: str, raw: Any) -> Any:
-    if type_name not in SUPPORTED_TYPES:
-        raise InvalidValue(type_name, "Неподдерживаемый тип")
+def _max_id(table_data: Columns) -> int:
+    max_id = 0
+    for v in table_data.column(ID_COLUMN):
+        try:
+            max_id = max(max_id, int(v or 0))
+        except Exception:
+            continue
+    return max_id
 
-    if type_name == "str":
-        if not isinstance(raw, str):
-            raw = str(raw)
-        return raw
 
-    if type_name == "int":
-        if isinstance(raw, bool):
-            raise InvalidValue(raw, "Ожидалось int")
+def _ids_at(table_data: Columns, positions: list[int]) -> list[int]:
+    ids_col = table_data.column(ID_COLUMN)
+    ids: list[int] = []
+    for i in positions:
         try:
-            return int(raw)
-        except Exception as exc:
-            raise InvalidValue(raw, "Ожидалось int") from exc
+            ids.append(int(ids_col[i]))
+        except Exception:
+            pass
+    return ids
 
-    if type_name == "bool":
-        if isinstance(raw, bool):
-            return raw
-        if isinstance(raw, str):
-            v = raw.strip().lower()
-            if v in {"true", "1", "yes", "y", "да", "д"}:
-                return True
-            if v in {"false", "0", "no", "n", "нет", "н"}:
-                return False
-        raise InvalidValue(raw, "Ожидалось bool")
 
-    raise InvalidValue(raw, "Неподдерживаемый тип")
+def _match_positions(table_data: Columns, col_name: str, val: Any) -> list[int]:
+    """Return positions of rows where col_name == val; ID uses the hash index."""
+    if col_name == ID_COLUMN:
+        pos = table_data.id_index().get(val)
+        return [] if pos is None else [pos]
+    return table_data.find(col_name, val)
+
+
+def where_condition(
+    metadata: dict[str, Any],
+    table_name: str,
+    where_clause: dict[str, Any],
+) -> tuple[str, Any]:
+    """Validate where_clause against the schema; return (column, coerced value)."""
+    coercers = _table_schema(metadata, table_name).coercers
+
+    if len(where_clause) != 1:
+        raise InvalidValue(where_clause, "where поддерживает одно условие col = value")
+
+    (col_name, raw_val), = where_clause.items()
+    if col_name not in coercers:
+        raise KeyError(col_name)
+    return col_name, coercers[col_name](raw_val)
 
 
 def create_table(
@@ -92,7 +189,8 @@ def create_table(
     full_cols = [Column(ID_COLUMN, "int"), *user_cols]
 
     metadata["tables"][table_name] = {
-        "columns": [{"name": c.name, "type_name": c.type_name} for c in full_cols]
+        "columns": [{"name": c.name, "type_name": c.type_name} for c in full_cols],
+        "next_id": 1,
     }
     return metadata
 
@@ -117,139 +215,127 @@ def insert_record(
     metadata: dict[str, Any],
     table_name: str,
     values: list[Any],
-    table_data: list[dict[str, Any]],
-) -> tuple[list[dict[str, Any]], int]:
-    """Insert record, validate types/count, auto-generate ID."""
-    cols = _schema_columns(metadata, table_name)
-    schema = _schema_map(cols)
-    user_cols = [c for c in cols if c.name != ID_COLUMN]
+    table_data: Columns,
+) -> tuple[Columns, int]:
+    """Insert record, validate types/count, auto-generate ID.
 
-    if len(values) != len(user_cols):
-        raise InvalidValue(values, "Неверное количество значений для insert")
-
-    record: dict[str, Any] = {}
-    for col, raw_val in zip(user_cols, values, strict=True):
-        record[col.name] = _coerce_value(schema[col.name], raw_val)
-
-    max_id = 0
-    for row in table_data:
-        try:
-            max_id = max(max_id, int(row.get(ID_COLUMN, 0)))
-        except Exception:
-            continue
+    The ID comes from the table's next_id counter, which is advanced in
+    metadata; the caller must save metadata along with table data.
+    """
+    table_data, new_ids = insert_many(metadata, table_name, [values], table_data)
+    return table_data, new_ids[0]
 
-    new_id = max_id + 1
-    record[ID_COLUMN] = new_id
 
-    table_data.append(record)
-    return table_data, new_id
+def insert_many(
+    metadata: dict[str, Any],
+    table_name: str,
+    rows_values: list[list[Any]],
+    table_data: Columns,
+) -> tuple[Columns, list[int]]:
+    """Insert several records at once; return their generated IDs.
+
+    The schema is resolved once for the whole batch, and every row is
+    validated before any of them is added.
+    """
+    coercers = _table_schema(metadata, table_name).user_coercers
+
+    records: list[dict[str, Any]] = []
+    for values in rows_values:
+        if len(values) != len(coercers):
+            raise InvalidValue(values, "Неверное количество значений для insert")
+        records.append(
+            {
+                name: coerce(raw_val)
+                for (name, coerce), raw_val in zip(coercers, values, strict=True)
+            }
+        )
+
+    table_meta = metadata["tables"][table_name]
+    next_id = table_meta.get("next_id")
+    if next_id is None:
+        next_id = _max_id(table_data) + 1
+
+    new_ids: list[int] = []
+    for record in records:
+        record[ID_COLUMN] = next_id
+        table_data.append(record)
+        new_ids.append(next_id)
+        next_id += 1
+
+    table_meta["next_id"] = next_id
+    return table_data, new_ids
 
 
 def select_records(
     metadata: dict[str, Any],
     table_name: str,
-    table_data: list[dict[str, Any]],
+    table_data: Columns,
     where_clause: dict[str, Any] | None = None,
-) -> list[dict[str, Any]]:
-    """Select rows by optional equals where_clause."""
-    _ = _schema_columns(metadata, table_name)  # validate table exists
+) -> Sequence[int]:
+    """Return positions of rows matching optional equals where_clause.
+
+    Rows are materialized by the caller. Without where_clause this is a
+    range over the whole table rather than a list, so callers must treat
+    the result as read-only.
+    """
+    _ = _table_schema(metadata, table_name)  # validate table exists
     if not where_clause:
-        return list(table_data)
-
-    cols = _schema_columns(metadata, table_name)
-    schema = _schema_map(cols)
-
-    if len(where_clause) != 1:
-        raise InvalidValue(where_clause, "where поддерживает одно условие col = value")
-
-    (col_name, raw_val), = where_clause.items()
-    if col_name not in schema:
-        raise KeyError(col_name)
+        return range(len(table_data))
 
-    val = _coerce_value(schema[col_name], raw_val)
-    return [r for r in table_data if r.get(col_name) == val]
+    col_name, val = where_condition(metadata, table_name, where_clause)
+    return _match_positions(table_data, col_name, val)
 
 
 def update_records(
     metadata: dict[str, Any],
     table_name: str,
-    table_data: list[dict[str, Any]],
+    table_data: Columns,
     set_clause: dict[str, Any],
     where_clause: dict[str, Any],
-) -> tuple[list[dict[str, Any]], list[int]]:
+) -> tuple[Columns, list[int]]:
     """Update rows matching where_clause; return updated ids."""
-    cols = _schema_columns(metadata, table_name)
-    schema = _schema_map(cols)
+    coercers = _table_schema(metadata, table_name).coercers
 
     if not set_clause:
         raise InvalidValue(set_clause, "set не может быть пустым")
     if ID_COLUMN in set_clause:
         raise InvalidValue(ID_COLUMN, "Нельзя обновлять ID")
 
-    if len(where_clause) != 1:
-        raise InvalidValue(where_clause, "where поддерживает одно условие col = value")
-
-    (w_col, w_raw), = where_clause.items()
-    if w_col not in schema:
-        raise KeyError(w_col)
-    w_val = _coerce_value(schema[w_col], w_raw)
+    w_col, w_val = where_condition(metadata, table_name, where_clause)
 
     coerced_set: dict[str, Any] = {}
     for k, v in set_clause.items():
-        if k not in schema:
+        if k not in coercers:
             raise KeyError(k)
-        coerced_set[k] = _coerce_value(schema[k], v)
+        coerced_set[k] = coercers[k](v)
 
-    updated_ids: list[int] = []
-    for row in table_data:
-        if row.get(w_col) == w_val:
-            row.update(coerced_set)
-            try:
-                updated_ids.append(int(row.get(ID_COLUMN)))
-            except Exception:
-                pass
+    positions = _match_positions(table_data, w_col, w_val)
+    for i in positions:
+        for k, v in coerced_set.items():
+            table_data.set(i, k, v)
 
-    return table_data, updated_ids
+    return table_data, _ids_at(table_data, positions)
 
 
 @confirm_action("удаление записи")
 def delete_records(
     metadata: dict[str, Any],
     table_name: str,
-    table_data: list[dict[str, Any]],
+    table_data: Columns,
     where_clause: dict[str, Any],
-) -> tuple[list[dict[str, Any]], list[int]]:
+) -> tuple[Columns, list[int]]:
     """Delete rows matching where_clause; return deleted ids."""
-    cols = _schema_columns(metadata, table_name)
-    schema = _schema_map(cols)
-
-    if len(where_clause) != 1:
-        raise InvalidValue(where_clause, "where поддерживает одно условие col = value")
-
-    (w_col, w_raw), = where_clause.items()
-    if w_col not in schema:
-        raise KeyError(w_col)
-    w_val = _coerce_value(schema[w_col], w_raw)
-
-    kept: list[dict[str, Any]] = []
-    deleted_ids: list[int] = []
-
-    for row in table_data:
-        if row.get(w_col) == w_val:
-            try:
-                deleted_ids.append(int(row.get(ID_COLUMN)))
-            except Exception:
-                pass
-        else:
-            kept.append(row)
-
-    return kept, deleted_ids
+    w_col, w_val = where_condition(metadata, table_name, where_clause)
+    positions = _match_positions(table_data, w_col, w_val)
+    deleted_ids = _ids_at(table_data, positions)
+    table_data.delete(positions)
+    return table_data, deleted_ids
 
 
 def table_info(
     metadata: dict[str, Any],
     table_name: str,
-    table_data: list[dict[str, Any]],
+    row_count: int,
 ) -> dict[str, Any]:
     """Return info dict about table."""
     cols = _schema_columns(metadata, table_name)
@@ -257,5 +343,5 @@ def table_info(
     return {
         "table": table_name,
         "columns": cols_str,
-        "count": len(table_data),
+        "count": row_count,
     }
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import time
+from collections import OrderedDict
 from collections.abc import Callable
 from functools import wraps
 from typing import Any, TypeVar
@@ -23,6 +24,25 @@ class InvalidValue(ValueError):
         self.value = value
 
 
+def report_error(exc: Exception) -> None:
+    """Print the user message for an error raised by a DB operation."""
+    if isinstance(exc, FileNotFoundError):
+        print(
+            "Ошибка: Файл данных не найден. "
+            "Возможно, база данных не инициализирована."
+        )
+    elif isinstance(exc, KeyError):
+        print(f"Ошибка: Таблица или столбец {exc} не найден.")
+    elif isinstance(exc, InvalidValue):
+        print(f"Некорректное значение: {exc.value}. Попробуйте снова.")
+    elif isinstance(exc, ValueError):
+        print(f"Ошибка валидации: {exc}")
+    elif isinstance(exc, DBError):
+        print(f"Ошибка: {exc}")
+    else:
+        print(f"Произошла непредвиденная ошибка: {exc}")
+
+
 def handle_db_errors(func: Callable[..., T]) -> Callable[..., T | None]:
     """Centralized error handling for DB operations."""
 
@@ -30,26 +50,8 @@ def handle_db_errors(func: Callable[..., T]) -> Callable[..., T | None]:
     def wrapper(*args: Any, **kwargs: Any) -> T | None:
         try:
             return func(*args, **kwargs)
-        except FileNotFoundError:
-            print(
-                "Ошибка: Файл данных не найден. "
-                "Возможно, база данных не инициализирована."
-            )
-            return None
-        except KeyError as exc:
-            print(f"Ошибка: Таблица или столбец {exc} не найден.")
-            return None
-        except InvalidValue as exc:
-            print(f"Некорректное значение: {exc.value}. Попробуйте снова.")
-            return None
-        except ValueError as exc:
-            print(f"Ошибка валидации: {exc}")
-            return None
-        except DBError as exc:
-            print(f"Ошибка: {exc}")
-            return None
         except Exception as exc:
-            print(f"Произошла непредвиденная ошибка: {exc}")
+            report_error(exc)
             return None
 
     return wrapper
@@ -90,18 +92,29 @@ def log_time(func: Callable[..., T]) -> Callable[..., T]:
     return wrapper
 
 
-def create_cacher() -> Callable[[Any, Callable[[], T]], T]:
+def create_cacher(maxsize: int = 128) -> Callable[[Any, Callable[[], T]], T]:
     """
     Return cache_result(key, value_func) with dict stored in closure.
     If key in cache -> return cached value, else compute, store, return.
+
+    At most maxsize entries are kept, least recently used are evicted.
+    cache_result.invalidate(prefix) drops every tuple key starting with prefix.
     """
-    cache: dict[Any, Any] = {}
+    cache: OrderedDict[Any, Any] = OrderedDict()
 
     def cache_result(key: Any, value_func: Callable[[], T]) -> T:
         if key in cache:
+            cache.move_to_end(key)
             return cache[key]
         value = value_func()
         cache[key] = value
+        if len(cache) > maxsize:
+            cache.popitem(last=False)
         return value
 
+    def invalidate(prefix: Any) -> None:
+        for key in [k for k in cache if isinstance(k, tuple) and k[:1] == (prefix,)]:
+            del cache[key]
+
+    cache_result.invalidate = invalidate  # type: ignore[attr-defined]
     return cache_result
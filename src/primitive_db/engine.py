@@ -1,16 +1,21 @@
 from __future__ import annotations
 
-import os
+import copy
+from collections.abc import Callable, Sequence
 from typing import Any
 
 from prettytable import PrettyTable
 
 from src.primitive_db import core
+from src.primitive_db.columns import Columns
 from src.primitive_db.constants import ID_COLUMN, META_FILE, PROMPT_TEXT
-from src.primitive_db.decorators import create_cacher, handle_db_errors, log_time
+from src.primitive_db.decorators import create_cacher, log_time, report_error
 from src.primitive_db.parser import Command, parse_command
 from src.primitive_db.utils import (
+    append_table_log,
+    append_table_rows,
     ask_string,
+    count_rows,
     delete_table_file,
     load_metadata,
     load_table_data,
@@ -30,6 +35,10 @@ def print_help() -> None:
     print("<command> info <имя> - вывести информацию о таблице\n")
 
     print("<command> insert into <таблица> values (v1, v2, ...) - создать запись")
+    print(
+        "<command> insert into <таблица> values (v1, ...), (v1, ...) "
+        "- создать несколько записей"
+    )
     print("<command> select from <таблица> [where col = value] - прочитать записи")
     print(
         "<command> update <таблица> set col = value where col = value - обновить запись"
@@ -41,11 +50,41 @@ def print_help() -> None:
     print("<command> help - справочная информация\n")
 
 
+_META_CACHE: tuple[int, dict[str, Any]] | None = None
+
+
 def _ensure_meta_shape(meta: dict[str, Any]) -> dict[str, Any]:
     meta.setdefault("tables", {})
     return meta
 
 
+def _cached_load_metadata(*, for_write: bool = False) -> dict[str, Any]:
+    """Load metadata, re-reading db_meta.json only when its mtime changes.
+
+    The cached dict is shared between read-only callers; pass for_write=True
+    to get a private copy that can be mutated before _cached_save_metadata.
+    """
+    global _META_CACHE
+    try:
+        mtime = META_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        _META_CACHE = None
+        return _ensure_meta_shape({})
+
+    if _META_CACHE is None or _META_CACHE[0] != mtime:
+        _META_CACHE = (mtime, _ensure_meta_shape(load_metadata(META_FILE)))
+
+    meta = _META_CACHE[1]
+    return copy.deepcopy(meta) if for_write else meta
+
+
+def _cached_save_metadata(meta: dict[str, Any]) -> None:
+    """Save metadata and refresh the cache with the written dict."""
+    global _META_CACHE
+    save_metadata(META_FILE, meta)
+    _META_CACHE = (META_FILE.stat().st_mtime_ns, meta)
+
+
 def _columns_for_table(meta: dict[str, Any], table_name: str) -> list[str]:
     cols = meta["tables"][table_name]["columns"]
     return [c["name"] for c in cols]
@@ -56,28 +95,32 @@ def _user_columns_for_table(meta: dict[str, Any], table_name: str) -> list[str]:
     return [c for c in cols if c != ID_COLUMN]
 
 
-def _make_table_view(columns: list[str], rows: list[dict[str, Any]]) -> PrettyTable:
+_SELECT_CACHE = create_cacher()
+
+
+def _make_table_view(
+    columns: list[str],
+    data: Columns,
+    positions: Sequence[int],
+) -> PrettyTable:
     pt = PrettyTable()
     pt.field_names = columns
-    for r in rows:
-        pt.add_row([r.get(c) for c in columns])
+    pt.add_rows(list(zip(*(data.take(c, positions) for c in columns), strict=True)))
     return pt
 
 
-@handle_db_errors
 def _handle_create_table(cmd: Command) -> None:
-    meta = _ensure_meta_shape(load_metadata(META_FILE))
+    meta = _cached_load_metadata(for_write=True)
     updated = core.create_table(meta, cmd.table or "", cmd.columns or [])
-    save_metadata(META_FILE, updated)
-    save_table_data(cmd.table or "", [])
+    _cached_save_metadata(updated)
+    save_table_data(cmd.table or "", Columns())
     cols = updated["tables"][cmd.table]["columns"]
     cols_str = ", ".join([f'{c["name"]}:{c["type_name"]}' for c in cols])
     print(f'Таблица "{cmd.table}" успешно создана со столбцами: {cols_str}')
 
 
-@handle_db_errors
-def _handle_list_tables() -> None:
-    meta = _ensure_meta_shape(load_metadata(META_FILE))
+def _handle_list_tables(cmd: Command) -> None:
+    meta = _cached_load_metadata()
     tables = core.list_tables(meta)
     if not tables:
         print("Таблиц нет.")
@@ -86,22 +129,23 @@ def _handle_list_tables() -> None:
         print(f"- {t}")
 
 
-@handle_db_errors
 def _handle_drop_table(cmd: Command) -> None:
-    meta = _ensure_meta_shape(load_metadata(META_FILE))
+    meta = _cached_load_metadata(for_write=True)
     updated = core.drop_table(meta, cmd.table or "")
     if updated is None:
         return
-    save_metadata(META_FILE, updated)
+    _cached_save_metadata(updated)
     delete_table_file(cmd.table or "")
+    _SELECT_CACHE.invalidate(cmd.table or "")
     print(f'Таблица "{cmd.table}" успешно удалена.')
 
 
 @log_time
-@handle_db_errors
 def _handle_insert(cmd: Command) -> None:
-    meta = _ensure_meta_shape(load_metadata(META_FILE))
+    meta = _cached_load_metadata(for_write=True)
     table = cmd.table or ""
+    # insert_many validates every row before appending, so the cached table
+    # is extended in place instead of being copied.
     data = load_table_data(table)
 
     if cmd.name == "insert_kv":
@@ -112,20 +156,28 @@ def _handle_insert(cmd: Command) -> None:
             if col not in kv:
                 raise core.InvalidValue(col, "Все поля обязательны")
             values.append(kv[col])
+        rows_values = [values]
+    elif cmd.name == "insert_many":
+        rows_values = cmd.rows or []
     else:
-        values = cmd.values or []
+        rows_values = [cmd.values or []]
 
-    data, new_id = core.insert_record(meta, table, values, data)
-    save_table_data(table, data)
-    print(f'Запись с ID={new_id} успешно добавлена в таблицу "{table}".')
+    data, new_ids = core.insert_many(meta, table, rows_values, data)
+    _cached_save_metadata(meta)
+    append_table_rows(table, data, len(new_ids))
+    _SELECT_CACHE.invalidate(table)
+
+    if len(new_ids) == 1:
+        print(f'Запись с ID={new_ids[0]} успешно добавлена в таблицу "{table}".')
+    else:
+        print(f"Добавлено записей: {len(new_ids)}.")
 
 
 @log_time
-@handle_db_errors
 def _handle_update(cmd: Command) -> None:
-    meta = _ensure_meta_shape(load_metadata(META_FILE))
+    meta = _cached_load_metadata()
     table = cmd.table or ""
-    data = load_table_data(table)
+    data = load_table_data(table, for_write=True)
 
     data, updated_ids = core.update_records(
         meta,
@@ -134,7 +186,8 @@ def _handle_update(cmd: Command) -> None:
         cmd.set_clause or {},
         cmd.where_clause or {},
     )
-    save_table_data(table, data)
+    append_table_log(table, data, updated=updated_ids)
+    _SELECT_CACHE.invalidate(table)
 
     if len(updated_ids) == 1:
         print(f'Запись с ID={updated_ids[0]} в таблице "{table}" успешно обновлена.')
@@ -143,17 +196,17 @@ def _handle_update(cmd: Command) -> None:
 
 
 @log_time
-@handle_db_errors
 def _handle_delete(cmd: Command) -> None:
-    meta = _ensure_meta_shape(load_metadata(META_FILE))
+    meta = _cached_load_metadata()
     table = cmd.table or ""
-    data = load_table_data(table)
+    data = load_table_data(table, for_write=True)
 
     result = core.delete_records(meta, table, data, cmd.where_clause or {})
     if result is None:
         return
     data, deleted_ids = result
-    save_table_data(table, data)
+    append_table_log(table, data, deleted=deleted_ids)
+    _SELECT_CACHE.invalidate(table)
 
     if len(deleted_ids) == 1:
         print(f'Запись с ID={deleted_ids[0]} успешно удалена из таблицы "{table}".')
@@ -161,21 +214,75 @@ def _handle_delete(cmd: Command) -> None:
         print(f"Удалено записей: {len(deleted_ids)}.")
 
 
-@handle_db_errors
 def _handle_info(cmd: Command) -> None:
-    meta = _ensure_meta_shape(load_metadata(META_FILE))
+    meta = _cached_load_metadata()
     table = cmd.table or ""
-    data = load_table_data(table)
-    info = core.table_info(meta, table, data)
+    info = core.table_info(meta, table, count_rows(table))
     print(f"Таблица: {info['table']}")
     print(f"Столбцы: {info['columns']}")
     print(f"Количество записей: {info['count']}")
 
 
+def _handle_select(cmd: Command) -> None:
+    table = cmd.table or ""
+    meta = _cached_load_metadata()
+    try:
+        st = table_path(table).stat()
+    except FileNotFoundError:
+        st = None
+    # Key on the coerced condition and its type: 1 == True and they hash alike.
+    where = (
+        core.where_condition(meta, table, cmd.where_clause)
+        if cmd.where_clause
+        else None
+    )
+    where_key = (where[0], type(where[1]).__name__, where[1]) if where else None
+    key = (
+        table,
+        where_key,
+        st.st_mtime_ns if st else 0,
+        st.st_size if st else 0,
+    )
+
+    def compute() -> tuple[Columns, Sequence[int]]:
+        data = load_table_data(table, where=where, stat=st)
+        positions = core.select_records(meta, table, data, cmd.where_clause)
+        return data, positions
+
+    data, positions = _SELECT_CACHE(key, compute)
+    columns = _columns_for_table(meta, table)
+    if positions:
+        print(_make_table_view(columns, data, positions))
+    else:
+        print("Записей нет.")
+
+
+def _handle_help(cmd: Command) -> None:
+    print_help()
+
+
+def _handle_unknown(cmd: Command) -> None:
+    print(f"Функции {cmd.name} нет. Попробуйте снова.")
+
+
+COMMAND_TABLE: dict[str, Callable[[Command], None]] = {
+    "help": _handle_help,
+    "create_table": _handle_create_table,
+    "list_tables": _handle_list_tables,
+    "drop_table": _handle_drop_table,
+    "info": _handle_info,
+    "insert": _handle_insert,
+    "insert_kv": _handle_insert,
+    "insert_many": _handle_insert,
+    "update": _handle_update,
+    "delete": _handle_delete,
+    "select": _handle_select,
+}
+
+
 def run() -> None:
     """Main loop."""
     print_help()
-    cacher = create_cacher()
 
     while True:
         line = ask_string(PROMPT_TEXT).strip()
@@ -188,59 +295,10 @@ def run() -> None:
                 print(f"Функции {bad} нет. Попробуйте снова.")
             continue
 
-        if cmd.name == "help":
-            print_help()
-            continue
-
         if cmd.name == "exit":
             return
 
-        if cmd.name == "create_table":
-            _handle_create_table(cmd)
-            continue
-
-        if cmd.name == "list_tables":
-            _handle_list_tables()
-            continue
-
-        if cmd.name == "drop_table":
-            _handle_drop_table(cmd)
-            continue
-
-        if cmd.name == "info":
-            _handle_info(cmd)
-            continue
-
-        if cmd.name in {"insert", "insert_kv"}:
-            _handle_insert(cmd)
-            continue
-
-        if cmd.name == "update":
-            _handle_update(cmd)
-            continue
-
-        if cmd.name == "delete":
-            _handle_delete(cmd)
-            continue
-
-        if cmd.name == "select":
-            table = cmd.table or ""
-            path = table_path(table)
-            mtime = os.path.getmtime(path) if path.exists() else 0.0
-            key = (table, str(cmd.where_clause), mtime)
-
-            def compute() -> list[dict[str, Any]]:
-                meta = _ensure_meta_shape(load_metadata(META_FILE))
-                data = load_table_data(table)
-                return core.select_records(meta, table, data, cmd.where_clause)
-
-            rows = cacher(key, compute)
-            meta = _ensure_meta_shape(load_metadata(META_FILE))
-            columns = _columns_for_table(meta, table)
-            if rows:
-                print(_make_table_view(columns, rows))
-            else:
-                print("Записей нет.")
-            continue
-
-        print(f"Функции {cmd.name} нет. Попробуйте снова.")
+        try:
+            COMMAND_TABLE.get(cmd.name, _handle_unknown)(cmd)
+        except Exception as exc:
+            report_error(exc)
@@ -18,6 +18,7 @@ class Command:
     values: list[Any] | None = None
     set_clause: dict[str, Any] | None = None
     where_clause: dict[str, Any] | None = None
+    rows: list[list[Any]] | None = None
 
 
 _SQL_INSERT_RE = re.compile(
@@ -37,6 +38,17 @@ _SQL_UPDATE_RE = re.compile(
     re.IGNORECASE,
 )
 
+_SQL_RE_BY_KEYWORD = {
+    "insert": _SQL_INSERT_RE,
+    "select": _SQL_SELECT_RE,
+    "delete": _SQL_DELETE_RE,
+    "update": _SQL_UPDATE_RE,
+}
+
+_VALUES_GROUP_SEP_RE = re.compile(r"\)\s*,\s*\(")
+
+_LITERALS = {"true": True, "false": False}
+
 _COND_RE = re.compile(r"^(?P<col>\w+)\s*=\s*(?P<val>.+)$")
 _ASSIGN_RE = re.compile(r"^(?P<col>\w+)\s*=\s*(?P<val>.+)$")
 
@@ -45,12 +57,13 @@ def _parse_literal(raw: str) -> Any:
     raw = raw.strip()
     if len(raw) >= 2 and raw[0] == raw[-1] == '"':
         return raw[1:-1]
-    low = raw.lower()
-    if low in {"true", "false"}:
-        return low == "true"
-    if re.fullmatch(r"-?\d+", raw):
-        return int(raw)
-    return raw
+    first = raw[:1]
+    if (first == "-" or first.isdecimal()) and "_" not in raw:
+        try:
+            return int(raw)
+        except ValueError:
+            pass
+    return _LITERALS.get(raw.lower(), raw)
 
 
 def _parse_csv_values(inside: str) -> list[Any]:
@@ -61,6 +74,27 @@ def _parse_csv_values(inside: str) -> list[Any]:
     return [_parse_literal(x) for x in row if x.strip() != ""]
 
 
+def _split_values_groups(inside: str) -> list[str]:
+    """Split '1, "a"), (2, "b"' into the contents of each (...) group."""
+    groups: list[str] = []
+    start = 0
+    in_quotes = False
+    i = 0
+    while i < len(inside):
+        ch = inside[i]
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif ch == ")" and not in_quotes:
+            m = _VALUES_GROUP_SEP_RE.match(inside, i)
+            if m:
+                groups.append(inside[start:i])
+                start = i = m.end()
+                continue
+        i += 1
+    groups.append(inside[start:])
+    return groups
+
+
 def _parse_condition(text: str) -> dict[str, Any]:
     m = _COND_RE.match(text.strip())
     if not m:
@@ -86,16 +120,26 @@ def parse_command(line: str) -> Command:
     if not line:
         raise InvalidValue(line, "Пустая команда")
 
-    m = _SQL_INSERT_RE.match(line)
-    if m:
+    # Only the SQL form for the leading keyword can match, so try just that one.
+    keyword = line.split(None, 1)[0].lower()
+    sql_re = _SQL_RE_BY_KEYWORD.get(keyword)
+    m = sql_re.match(line) if sql_re is not None else None
+
+    if m and keyword == "insert":
+        groups = _split_values_groups(m.group("inside"))
+        if len(groups) > 1:
+            return Command(
+                name="insert_many",
+                table=m.group("table"),
+                rows=[_parse_csv_values(g) for g in groups],
+            )
         return Command(
             name="insert",
             table=m.group("table"),
-            values=_parse_csv_values(m.group("inside")),
+            values=_parse_csv_values(groups[0]),
         )
 
-    m = _SQL_SELECT_RE.match(line)
-    if m:
+    if m and keyword == "select":
         where = m.group("where")
         return Command(
             name="select",
@@ -103,16 +147,14 @@ def parse_command(line: str) -> Command:
             where_clause=_parse_condition(where) if where else None,
         )
 
-    m = _SQL_DELETE_RE.match(line)
-    if m:
+    if m and keyword == "delete":
         return Command(
             name="delete",
             table=m.group("table"),
             where_clause=_parse_condition(m.group("where")),
         )
 
-    m = _SQL_UPDATE_RE.match(line)
-    if m:
+    if m and keyword == "update":
         return Command(
             name="update",
             table=m.group("table"),
@@ -185,9 +227,13 @@ def parse_command(line: str) -> Command:
                 "Использование: update <table> set col=value ... where col = value",
             )
         table = tokens[1]
-        if "where" not in [t.lower() for t in tokens]:
+        # Single pass over the set pairs; lowercases tokens only up to "where".
+        idx = next(
+            (i for i in range(3, len(tokens)) if tokens[i].lower() == "where"),
+            None,
+        )
+        if idx is None:
             raise InvalidValue(line, "update требует where")
-        idx = [t.lower() for t in tokens].index("where")
         set_pairs = tokens[3:idx]
         where_text = " ".join(tokens[idx + 1 :])
         set_clause: dict[str, Any] = {}
@@ -1,12 +1,47 @@
 from __future__ import annotations
 
+import codecs
+import gzip
 import json
+import os
+import re
+import zlib
+from collections.abc import Iterable, Iterator
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 import prompt
 
-from src.primitive_db.constants import DATA_DIR
+from src.primitive_db.columns import Columns
+from src.primitive_db.constants import DATA_DIR, ID_COLUMN
+
+# table -> (file mtime, columns, update/delete records, gzip members in the file)
+_TABLE_CACHE: dict[str, tuple[int, Columns, int, int]] = {}
+
+# Update/delete records are appended as {"#update": row} / {"#delete": id}.
+# Column names are identifiers, so they never start with "#".
+_LOG_UPDATE = "#update"
+_LOG_DELETE = "#delete"
+_LOG_PREFIX = '{"#'
+_LOG_DELETE_PREFIX = '{"#delete"'
+
+# NDJSON lines decoded per json.loads call while reading a table file.
+_READ_BATCH = 4096
+
+# Table files are gzip-compressed; low levels keep saves cheap and still
+# shrink JSON several times.
+_GZIP_LEVEL = 3
+_READ_CHUNK = 1 << 16
+
+# Every append adds a gzip member; past max(64, rows / 64) of them the file
+# is rewritten as one member.
+_MEMBERS_MIN = 64
+_ROWS_PER_MEMBER = 64
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_ROW_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_JSON_ITEM_GAP = re.compile(r"[\s,]*")
 
 
 def ensure_data_dir() -> None:
@@ -33,32 +68,246 @@ def save_metadata(filepath: Path, data: dict[str, Any]) -> None:
 def table_path(table_name: str) -> Path:
     """Return path to data file for table."""
     ensure_data_dir()
+    return DATA_DIR / f"{table_name}.json.gz"
+
+
+def _legacy_table_path(table_name: str) -> Path:
+    """Uncompressed data file written by older versions."""
     return DATA_DIR / f"{table_name}.json"
 
 
-def load_table_data(table_name: str) -> list[dict[str, Any]]:
-    """Load table data list from data/<table>.json. If file missing, return []"""
+def _stored_table(table_name: str) -> tuple[Path, os.stat_result] | None:
+    """Return (path, stat) of the table file (or its old .json), None if missing."""
+    for path in (table_path(table_name), _legacy_table_path(table_name)):
+        try:
+            return path, path.stat()
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def _open_table_file(path: Path, mode: str) -> IO[str]:
+    return gzip.open(path, mode, compresslevel=_GZIP_LEVEL, encoding="utf-8")
+
+
+class _GzipLines:
+    """Text lines of a gzip file; counts its members while iterating."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.members = 0
+
+    def __iter__(self) -> Iterator[str]:
+        decode = codecs.getincrementaldecoder("utf-8")().decode
+        inflate = None
+        tail = ""
+        with self.path.open("rb") as f:
+            data = f.read(_READ_CHUNK)
+            while data:
+                if inflate is None:
+                    inflate = zlib.decompressobj(wbits=31)
+                    self.members += 1
+                lines = (tail + decode(inflate.decompress(data))).split("\n")
+                tail = lines.pop()
+                yield from lines
+                data = b""
+                if inflate.eof:
+                    data, inflate = inflate.unused_data, None
+                data = data or f.read(_READ_CHUNK)
+        tail += decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def _iter_json_array(text: str) -> Iterator[Any]:
+    """Yield items of a top-level JSON array one by one."""
+    pos = text.index("[") + 1
+    end = len(text)
+    while True:
+        pos = _JSON_ITEM_GAP.match(text, pos).end()
+        if pos >= end or text[pos] == "]":
+            return
+        item, pos = _JSON_DECODER.raw_decode(text, pos)
+        yield item
+
+
+def _is_legacy_array(text: str) -> bool:
+    """Tables used to be saved as one pretty-printed JSON array."""
+    return text.lstrip().startswith("[")
+
+
+def _replay_log(rows: list[Any]) -> list[Any]:
+    """Apply update/delete records to rows; updated rows keep their place."""
+    live: dict[Any, Any] = {}
+    for row in rows:
+        if _LOG_DELETE in row:
+            live.pop(row[_LOG_DELETE], None)
+        elif _LOG_UPDATE in row:
+            updated = row[_LOG_UPDATE]
+            live[updated.get(ID_COLUMN)] = updated
+        else:
+            live[row.get(ID_COLUMN)] = row
+    return list(live.values())
+
+
+def _iter_records(lines: Iterable[str], needle: str | None = None) -> Iterator[Any]:
+    """Decode NDJSON lines in batches, skipping row lines without needle."""
+    batch: list[str] = []
+    for line in lines:
+        if not line.startswith(_LOG_PREFIX) and (
+            not line.strip() or (needle is not None and needle not in line)
+        ):
+            continue
+        batch.append(line)
+        if len(batch) == _READ_BATCH:
+            yield from json.loads("[" + ",".join(batch) + "]")
+            batch = []
+    if batch:
+        yield from json.loads("[" + ",".join(batch) + "]")
+
+
+def _read_table_file(
+    path: Path,
+    needle: str | None = None,
+) -> tuple[list[Any], int, int]:
+    """Read records as stored; return (records, update/delete count, members)."""
+    if path.suffix == ".gz":
+        lines = _GzipLines(path)
+        records = list(_iter_records(lines, needle))
+        members = lines.members
+    else:
+        with path.open(encoding="utf-8") as f:
+            head = f.readline()
+            if _is_legacy_array(head):
+                return json.loads(head + f.read()), 0, 0
+            records = list(_iter_records(chain([head], f), needle))
+        members = 0
+    log = sum(1 for r in records if _LOG_UPDATE in r or _LOG_DELETE in r)
+    return records, log, members
+
+
+def _dump_row(row: dict[str, Any]) -> str:
+    return _JSON_ROW_ENCODER.encode(row) + "\n"
+
+
+def load_table_data(
+    table_name: str,
+    *,
+    for_write: bool = False,
+    where: tuple[str, Any] | None = None,
+    stat: os.stat_result | None = None,
+) -> Columns:
+    """Load cached table data; for_write gives a copy, where gives uncached matches."""
+    stored = (table_path(table_name), stat) if stat else _stored_table(table_name)
+    if stored is None:
+        _TABLE_CACHE.pop(table_name, None)
+        return Columns()
+    path, mtime = stored[0], stored[1].st_mtime_ns
+
+    cached = _TABLE_CACHE.get(table_name)
+    if cached is None or cached[0] != mtime:
+        if where is not None:
+            col_name, val = where
+            needle = json.dumps(val, ensure_ascii=False)
+            rows, log, _ = _read_table_file(path, needle)
+            if log:
+                rows = _replay_log(_read_table_file(path)[0])
+            return Columns.from_rows([r for r in rows if r.get(col_name) == val])
+        rows, log, members = _read_table_file(path)
+        data = Columns.from_rows(_replay_log(rows) if log else rows)
+        cached = (mtime, data, log, members)
+        _TABLE_CACHE[table_name] = cached
+
+    data = cached[1]
+    return data.copy() if for_write else data
+
+
+def count_rows(table_name: str) -> int:
+    """Return number of rows in table without building its columns."""
+    stored = _stored_table(table_name)
+    if stored is None:
+        return 0
+
+    path, mtime = stored[0], stored[1].st_mtime_ns
+    cached = _TABLE_CACHE.get(table_name)
+    if cached is not None and cached[0] == mtime:
+        return len(cached[1])
+    if path.suffix == ".gz":
+        return _count_lines(_GzipLines(path))
+    with path.open(encoding="utf-8") as f:
+        head = f.readline()
+        if _is_legacy_array(head):
+            return sum(1 for _ in _iter_json_array(head + f.read()))
+        return _count_lines(chain([head], f))
+
+
+def _count_lines(lines: Iterable[str]) -> int:
+    rows = deleted = 0
+    for line in lines:
+        if line.startswith(_LOG_PREFIX):
+            deleted += line.startswith(_LOG_DELETE_PREFIX)
+        elif line.strip():
+            rows += 1
+    return rows - deleted
+
+
+def save_table_data(table_name: str, data: Columns) -> None:
+    """Save table data to data/<table>.json.gz, dropping update/delete records."""
     path = table_path(table_name)
-    try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except FileNotFoundError:
-        return []
+    with _open_table_file(path, "wt") as f:
+        f.write("".join(_dump_row(row) for row in data.to_rows()))
+    _legacy_table_path(table_name).unlink(missing_ok=True)
+    _TABLE_CACHE[table_name] = (path.stat().st_mtime_ns, data, 0, 1)
 
 
-def save_table_data(table_name: str, data: list[dict[str, Any]]) -> None:
-    """Save table data list to data/<table>.json."""
+def _append_lines(table_name: str, data: Columns, lines: list[str], log: int) -> None:
+    """Append lines to the table file, or save it whole when it needs compaction."""
     path = table_path(table_name)
-    path.write_text(
-        json.dumps(data, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    cached = _TABLE_CACHE.get(table_name)
+    log_lines = (cached[2] if cached is not None else 0) + log
+    members = (cached[3] if cached is not None else 1) + 1
+    max_members = max(_MEMBERS_MIN, len(data) // _ROWS_PER_MEMBER)
+    try:
+        if not path.exists() or log_lines > len(data) or members > max_members:
+            save_table_data(table_name, data)
+            return
+
+        with _open_table_file(path, "at") as f:
+            f.write("".join(lines))
+    except OSError:
+        # data may be the cached table already holding rows that were not written.
+        _TABLE_CACHE.pop(table_name, None)
+        raise
+    _TABLE_CACHE[table_name] = (path.stat().st_mtime_ns, data, log_lines, members)
+
+
+def append_table_rows(table_name: str, data: Columns, count: int = 1) -> None:
+    """Append the last count rows of data to data/<table>.json.gz."""
+    size = len(data)
+    rows = data.rows(range(size - count, size))
+    _append_lines(table_name, data, [_dump_row(row) for row in rows], 0)
+
+
+def append_table_log(
+    table_name: str,
+    data: Columns,
+    *,
+    updated: list[int] | None = None,
+    deleted: list[int] | None = None,
+) -> None:
+    """Append update/delete records by ID; data must already hold the change."""
+    index = data.id_index()
+    lines = [_dump_row({_LOG_UPDATE: data.row(index[i])}) for i in updated or []]
+    lines += [_dump_row({_LOG_DELETE: i}) for i in deleted or []]
+    if lines:
+        _append_lines(table_name, data, lines, len(lines))
 
 
 def delete_table_file(table_name: str) -> None:
     """Remove table data file if it exists."""
-    path = table_path(table_name)
-    if path.exists():
-        path.unlink()
+    _TABLE_CACHE.pop(table_name, None)
+    table_path(table_name).unlink(missing_ok=True)
+    _legacy_table_path(table_name).unlink(missing_ok=True)
 
 
 def ask_string(text: str) -> str: